@@ -2,20 +2,30 @@
 
 from .icon_generator import (
     ADAPTIVE_ICON_SIZES,
+    ADAPTIVE_SAFE_ZONE_RATIO,
     ANDROID_ICON_SIZES,
+    analyze_safe_zone,
+    compute_safe_zone_scale,
     crop_icon_from_image,
     generate_adaptive_icon_layers,
     generate_android_icons,
+    image_from_buffer,
     load_image,
     prepare_icon,
+    write_manifest,
 )
 
 __all__ = [
     "ADAPTIVE_ICON_SIZES",
+    "ADAPTIVE_SAFE_ZONE_RATIO",
     "ANDROID_ICON_SIZES",
+    "analyze_safe_zone",
+    "compute_safe_zone_scale",
     "crop_icon_from_image",
     "generate_adaptive_icon_layers",
     "generate_android_icons",
+    "image_from_buffer",
     "load_image",
     "prepare_icon",
+    "write_manifest",
 ]
@@ -0,0 +1,195 @@
+"""Memory-budgeted batch processing for multiple source images."""
+
+from __future__ import annotations
+
+import os
+import re
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Sequence, Tuple
+
+from PIL import Image, ImageMode
+
+from .icon_generator import (
+    ManifestEntry,
+    generate_adaptive_icon_layers,
+    generate_android_icons,
+    prepare_icon,
+    write_manifest,
+)
+
+# Bytes per source pixel held at the peak of ``prepare_icon``: the RGBA copy
+# returned by ``load_image``, the copy made by ``_remove_edge_background``
+# (4 bytes each) and the ``visited`` grid used by the flood fill (one list slot
+# per pixel).
+_PEAK_BYTES_PER_PIXEL = 4 * 2 + 8
+
+_MEMORY_UNITS: Mapping[str, int] = {
+    "": 1,
+    "B": 1,
+    "K": 1024,
+    "M": 1024**2,
+    "G": 1024**3,
+    "T": 1024**4,
+}
+
+_MEMORY_PATTERN = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([KMGT]?)(?:I?B)?\s*$", re.IGNORECASE)
+
+BatchResult = Tuple[Dict[str, Dict[str, Path]], Dict[str, Dict[str, Path]] | None]
+
+
+@dataclass(frozen=True)
+class BatchJob:
+    """A single source image scheduled for conversion."""
+
+    source: Path
+    output_dir: Path
+    estimated_bytes: int
+
+
+def parse_memory_size(value: str) -> int:
+    """Parse a human readable size such as ``"512M"`` or ``"4GiB"`` into bytes."""
+
+    match = _MEMORY_PATTERN.match(value)
+    if match is None:
+        raise ValueError(f"invalid memory size: {value!r}")
+
+    number, unit = match.groups()
+    size = int(float(number) * _MEMORY_UNITS[unit.upper()])
+    if size <= 0:
+        raise ValueError(f"memory size must be positive, got {value!r}")
+    return size
+
+
+def estimate_peak_memory(source: str | Path) -> int:
+    """Estimate the peak memory in bytes needed to process *source*.
+
+    Only the image header is read; the pixel data is not decoded.
+    """
+
+    with Image.open(source) as img:
+        width, height = img.size
+        mode = ImageMode.getmode(img.mode)
+
+    decoded_bytes_per_pixel = len(mode.bands) * int(mode.typestr[-1])
+    return width * height * (decoded_bytes_per_pixel + _PEAK_BYTES_PER_PIXEL)
+
+
+def plan_batch(sources: Iterable[str | Path], output_dir: str | Path) -> List[BatchJob]:
+    """Create one job per source, writing into ``output_dir/<source stem>``."""
+
+    base_dir = Path(output_dir)
+    jobs: List[BatchJob] = []
+    seen: Dict[str, Path] = {}
+
+    for source in sources:
+        path = Path(source)
+        if not path.exists():
+            raise FileNotFoundError(f"Image not found: {path}")
+        if path.stem in seen:
+            raise ValueError(
+                f"Sources {seen[path.stem]} and {path} would share the output directory"
+                f" {base_dir / path.stem}"
+            )
+        seen[path.stem] = path
+        jobs.append(BatchJob(path, base_dir / path.stem, estimate_peak_memory(path)))
+
+    return jobs
+
+
+def _run_job(
+    job: BatchJob,
+    tolerance: int,
+    icon_options: Mapping[str, Any],
+    adaptive_options: Mapping[str, Any] | None,
+    manifest_name: str | None,
+) -> BatchResult:
+    manifest: List[ManifestEntry] | None = [] if manifest_name else None
+
+    icon = prepare_icon(job.source, tolerance=tolerance)
+    outputs = generate_android_icons(icon, job.output_dir, manifest=manifest, **icon_options)
+
+    adaptive_outputs = None
+    if adaptive_options is not None:
+        adaptive_outputs = generate_adaptive_icon_layers(
+            icon, job.output_dir, manifest=manifest, **adaptive_options
+        )
+
+    if manifest_name and manifest is not None:
+        write_manifest(manifest, job.output_dir / manifest_name)
+
+    return outputs, adaptive_outputs
+
+
+def _next_admissible(pending: Sequence[BatchJob], available: int | None, idle: bool) -> BatchJob | None:
+    """Pick the largest pending job that fits into *available* bytes.
+
+    A job larger than the whole budget is still admitted once nothing else is
+    running, so that it can never starve.
+    """
+
+    for job in pending:
+        if available is None or job.estimated_bytes <= available:
+            return job
+    if idle and pending:
+        return pending[0]
+    return None
+
+
+def run_batch(
+    jobs: Sequence[BatchJob],
+    *,
+    tolerance: int = 10,
+    icon_options: Mapping[str, Any] | None = None,
+    adaptive_options: Mapping[str, Any] | None = None,
+    max_memory: int | None = None,
+    max_workers: int | None = None,
+    manifest_name: str | None = None,
+) -> Dict[Path, BatchResult]:
+    """Process *jobs* in worker processes without exceeding *max_memory*.
+
+    Jobs are admitted largest first while the sum of their estimated peak
+    memory stays within the budget; smaller jobs fill the remaining room.
+    When *manifest_name* is given, each job writes a manifest of its outputs
+    to ``<job output dir>/<manifest_name>``. Returns a mapping
+    ``source -> (icon outputs, adaptive outputs or None)`` in the order of *jobs*.
+    """
+
+    if max_memory is not None and max_memory <= 0:
+        raise ValueError("max_memory must be positive")
+
+    workers = max_workers if max_workers is not None else (os.cpu_count() or 1)
+    if workers <= 0:
+        raise ValueError("max_workers must be positive")
+
+    icon_options = dict(icon_options or {})
+    adaptive_options = dict(adaptive_options) if adaptive_options is not None else None
+
+    pending = sorted(jobs, key=lambda job: job.estimated_bytes, reverse=True)
+    running: Dict[Future[BatchResult], BatchJob] = {}
+    results: Dict[Path, BatchResult] = {}
+    in_use = 0
+
+    with ProcessPoolExecutor(max_workers=min(workers, max(len(pending), 1))) as executor:
+        while pending or running:
+            while pending and len(running) < workers:
+                available = None if max_memory is None else max_memory - in_use
+                job = _next_admissible(pending, available, idle=not running)
+                if job is None:
+                    break
+
+                pending.remove(job)
+                future = executor.submit(
+                    _run_job, job, tolerance, icon_options, adaptive_options, manifest_name
+                )
+                running[future] = job
+                in_use += job.estimated_bytes
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                job = running.pop(future)
+                in_use -= job.estimated_bytes
+                results[job.source] = future.result()
+
+    return {job.source: results[job.source] for job in jobs}
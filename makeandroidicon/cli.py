@@ -3,34 +3,80 @@
 from __future__ import annotations
 
 import argparse
+import json
+import sys
 from pathlib import Path
+from typing import Dict
 
+from .batch import parse_memory_size, plan_batch, run_batch
+from .compare import compare_icon_trees
 from .icon_generator import (
     generate_adaptive_icon_layers,
     generate_android_icons,
     prepare_icon,
+    write_manifest,
 )
 
+_COMMANDS = {"generate", "compare"}
+
+
+def _channel_value(value: str) -> int:
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"整数を指定してください: {value}") from None
+    if number < 0 or number > 255:
+        raise argparse.ArgumentTypeError(f"0-255 の範囲で指定してください: {value}")
+    return number
+
+
+def _positive_int(value: str) -> int:
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"整数を指定してください: {value}") from None
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"1 以上の整数を指定してください: {value}")
+    return number
+
 
 def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(
+        prog="makeandroidicon",
         description=(
             "入力画像から白い余白を取り除き、Android向けランチャーアイコンを生成します。"
         ),
+        epilog=(
+            "サブコマンドを省略した場合は generate として扱います。"
+            "compare という名前のファイルを変換するには generate を明示してください。"
+        ),
     )
-    parser.add_argument(
+    subparsers = parser.add_subparsers(dest="command", metavar="{generate,compare}")
+
+    generate = subparsers.add_parser(
+        "generate",
+        help="元画像からアイコンを生成する (既定)",
+        description=(
+            "入力画像から白い余白を取り除き、Android向けランチャーアイコンを生成します。"
+        ),
+    )
+    generate.add_argument(
         "source",
         type=Path,
-        help="白い余白が含まれる元画像へのパス",
+        nargs="+",
+        help=(
+            "白い余白が含まれる元画像へのパス。複数指定すると出力先の下に"
+            "ファイル名ごとのディレクトリを作成して並列に処理します"
+        ),
     )
-    parser.add_argument(
+    generate.add_argument(
         "-o",
         "--output",
         type=Path,
         default=Path("build/icons"),
         help="生成した各densityフォルダを出力するディレクトリ",
     )
-    parser.add_argument(
+    generate.add_argument(
         "--tolerance",
         type=int,
         default=10,
@@ -38,85 +84,173 @@ def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
             "白背景判定の許容値 (0-255)。背景がわずかに灰色の場合は値を上げます。"
         ),
     )
-    parser.add_argument(
+    generate.add_argument(
         "--filename",
         default="ic_launcher.webp",
         help="各densityフォルダに保存するファイル名",
     )
-    parser.add_argument(
+    generate.add_argument(
         "--format",
         default=None,
         help="出力フォーマット (例: webp, png)。未指定ならファイル拡張子から推測",
     )
-    parser.add_argument(
+    generate.add_argument(
         "--round-filename",
         default="ic_launcher_round.webp",
         help="ラウンドアイコンを書き出すファイル名 (空文字で無効化)",
     )
-    parser.add_argument(
+    generate.add_argument(
         "--round-format",
         default=None,
         help="ラウンドアイコンのフォーマット。省略時は round-filename から推測",
     )
-    parser.add_argument(
+    generate.add_argument(
         "--adaptive",
         action="store_true",
         help="アダプティブアイコン用のレイヤー (foreground/background/XML) も生成",
     )
-    parser.add_argument(
+    generate.add_argument(
         "--adaptive-foreground",
         default="ic_launcher_foreground.webp",
         help="アダプティブアイコンのforegroundファイル名",
     )
-    parser.add_argument(
+    generate.add_argument(
         "--adaptive-background",
         default="ic_launcher_background.webp",
         help="アダプティブアイコンのbackgroundファイル名",
     )
-    parser.add_argument(
+    generate.add_argument(
         "--adaptive-format",
         default=None,
         help="アダプティブアイコンレイヤーのフォーマット (例: webp)",
     )
-    parser.add_argument(
+    generate.add_argument(
         "--adaptive-color",
         default="#ffffff",
         help="backgroundレイヤーに使うカラー (#RRGGBB / #AARRGGBB / transparent)",
     )
-    parser.add_argument(
+    generate.add_argument(
         "--adaptive-scale",
         type=float,
         default=0.9,
         help="foregroundの縮尺 (0-1)。1で背景と同じサイズ",
     )
-    parser.add_argument(
+    generate.add_argument(
+        "--adaptive-auto-scale",
+        action="store_true",
+        help=(
+            "foregroundの表示部分が66dpのセーフゾーンに収まる縮尺を自動計算する"
+            " (--adaptive-scale は無視されます)"
+        ),
+    )
+    generate.add_argument(
         "--adaptive-xml",
         default="ic_launcher.xml",
         help="生成するアダプティブアイコンXML名",
     )
-    parser.add_argument(
+    generate.add_argument(
         "--adaptive-xml-round",
         default="ic_launcher_round.xml",
         help="ラウンド版XML名 (空文字で生成しない)",
     )
+    generate.add_argument(
+        "--jobs",
+        type=_positive_int,
+        default=None,
+        help="複数画像を処理する際のワーカー数。省略時はCPU数 (元画像が1つの場合は無視)",
+    )
+    generate.add_argument(
+        "--max-memory",
+        type=parse_memory_size,
+        default=None,
+        help=(
+            "複数画像を処理する際のメモリ上限 (例: 4G, 512M)。"
+            "画像ヘッダーから見積もったピークメモリの合計がこの値を超えないよう実行します"
+            " (元画像が1つの場合は無視)"
+        ),
+    )
+    generate.add_argument(
+        "--manifest",
+        default=None,
+        help=(
+            "出力ディレクトリに書き出すマニフェスト (JSON) のファイル名。"
+            "各出力のパス・density・種類・サイズ・形式・バイト数・SHA-256 を記録します"
+        ),
+    )
+
+    compare = subparsers.add_parser(
+        "compare",
+        help="2つの出力ディレクトリを比較する",
+        description="2つのアイコン出力ディレクトリを比較し、見た目の差分を報告します。",
+    )
+    compare.add_argument("baseline", type=Path, help="基準となる出力ディレクトリ")
+    compare.add_argument("candidate", type=Path, help="比較対象の出力ディレクトリ")
+    compare.add_argument(
+        "--threshold",
+        type=_channel_value,
+        default=0,
+        help="許容するチャンネルごとの最大差分 (0-255)。これを超えると差分ありと判定",
+    )
+    compare.add_argument(
+        "--jobs",
+        type=_positive_int,
+        default=None,
+        help="画像のデコードと比較に使うスレッド数",
+    )
+    compare.add_argument(
+        "--report",
+        type=Path,
+        default=None,
+        help="比較結果をJSONで書き出すパス",
+    )
+
+    if argv is None:
+        argv = sys.argv[1:]
+    if not argv or argv[0] not in _COMMANDS | {"-h", "--help"}:
+        argv = ["generate", *argv]
     return parser.parse_args(argv)
 
 
-def main(argv: list[str] | None = None) -> None:
-    args = parse_args(argv)
+def compare_main(args: argparse.Namespace) -> None:
+    report = compare_icon_trees(
+        args.baseline,
+        args.candidate,
+        threshold=args.threshold,
+        max_workers=args.jobs,
+    )
 
-    icon = prepare_icon(args.source, tolerance=args.tolerance)
-    round_filename = args.round_filename if args.round_filename else None
+    if args.report:
+        args.report.parent.mkdir(parents=True, exist_ok=True)
+        args.report.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
 
-    outputs = generate_android_icons(
-        icon,
-        args.output,
-        filename=args.filename,
-        image_format=args.format.upper() if args.format else None,
-        round_filename=round_filename,
-        round_format=args.round_format.upper() if args.round_format else None,
+    print(
+        f"{report['compared']} 件を比較しました"
+        f" (同一: {report['identical']}, 差分あり: {len(report['regressions'])})"
     )
+    for entry in report["regressions"]:
+        if entry["size_mismatch"]:
+            print(
+                f" - {entry['path']}: サイズ不一致"
+                f" {tuple(entry['baseline_size'])} -> {tuple(entry['candidate_size'])}"
+            )
+        else:
+            print(
+                f" - {entry['path']}: 最大差分 {entry['max_diff']},"
+                f" 平均差分 {entry['mean_diff']:.3f}"
+            )
+    for name in report["missing"]:
+        print(f" - {name}: 比較対象に存在しません")
+    for name in report["added"]:
+        print(f" - {name}: 基準に存在しません")
+
+    if report["regressions"] or report["missing"] or report["added"]:
+        raise SystemExit(1)
 
+
+def _print_outputs(
+    outputs: Dict[str, Dict[str, Path]],
+    adaptive_outputs: Dict[str, Dict[str, Path]] | None,
+) -> None:
     print("以下のアイコンを生成しました:")
     for density in sorted(outputs):
         variants = outputs[density]
@@ -124,30 +258,92 @@ def main(argv: list[str] | None = None) -> None:
             label = density if variant == "default" else f"{density} ({variant})"
             print(f" - {label}: {path}")
 
+    if adaptive_outputs is None:
+        return
+
+    print("アダプティブアイコン用レイヤー:")
+    for key in sorted(adaptive_outputs):
+        variants = adaptive_outputs[key]
+        if isinstance(variants, dict):
+            for variant, path in variants.items():
+                label = key if key != "xml" else variant
+                if key != "xml" and variant not in {"foreground", "background"}:
+                    label = f"{key} ({variant})"
+                elif key != "xml":
+                    label = f"{key} ({variant})"
+                print(f" - {label}: {path}")
+        else:
+            print(f" - {key}: {variants}")
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    if args.command == "compare":
+        compare_main(args)
+        return
+
+    round_filename = args.round_filename if args.round_filename else None
+    icon_options = {
+        "filename": args.filename,
+        "image_format": args.format.upper() if args.format else None,
+        "round_filename": round_filename,
+        "round_format": args.round_format.upper() if args.round_format else None,
+    }
+
+    adaptive_options = None
     if args.adaptive:
         xml_round_name = args.adaptive_xml_round if args.adaptive_xml_round else None
+        adaptive_options = {
+            "foreground_filename": args.adaptive_foreground,
+            "background_filename": args.adaptive_background,
+            "image_format": args.adaptive_format.upper() if args.adaptive_format else None,
+            "background_color": args.adaptive_color,
+            "foreground_scale": args.adaptive_scale,
+            "auto_scale": args.adaptive_auto_scale,
+            "xml_name": args.adaptive_xml,
+            "xml_round_name": xml_round_name,
+        }
+
+    if len(args.source) > 1:
+        jobs = plan_batch(args.source, args.output)
+        results = run_batch(
+            jobs,
+            tolerance=args.tolerance,
+            icon_options=icon_options,
+            adaptive_options=adaptive_options,
+            max_memory=args.max_memory,
+            max_workers=args.jobs,
+            manifest_name=args.manifest,
+        )
+        for source, (outputs, adaptive_outputs) in results.items():
+            print(f"[{source}]")
+            _print_outputs(outputs, adaptive_outputs)
+        return
+
+    ignored = [
+        option
+        for option, value in (("--jobs", args.jobs), ("--max-memory", args.max_memory))
+        if value is not None
+    ]
+    if ignored:
+        print(
+            f"警告: {', '.join(ignored)} は元画像を複数指定した場合のみ有効なため無視します",
+            file=sys.stderr,
+        )
+
+    manifest = [] if args.manifest else None
+
+    icon = prepare_icon(args.source[0], tolerance=args.tolerance)
+    outputs = generate_android_icons(icon, args.output, manifest=manifest, **icon_options)
+
+    adaptive_outputs = None
+    if adaptive_options is not None:
         adaptive_outputs = generate_adaptive_icon_layers(
-            icon,
-            args.output,
-            foreground_filename=args.adaptive_foreground,
-            background_filename=args.adaptive_background,
-            image_format=args.adaptive_format.upper() if args.adaptive_format else None,
-            background_color=args.adaptive_color,
-            foreground_scale=args.adaptive_scale,
-            xml_name=args.adaptive_xml,
-            xml_round_name=xml_round_name,
+            icon, args.output, manifest=manifest, **adaptive_options
         )
 
-        print("アダプティブアイコン用レイヤー:")
-        for key in sorted(adaptive_outputs):
-            variants = adaptive_outputs[key]
-            if isinstance(variants, dict):
-                for variant, path in variants.items():
-                    label = key if key != "xml" else variant
-                    if key != "xml" and variant not in {"foreground", "background"}:
-                        label = f"{key} ({variant})"
-                    elif key != "xml":
-                        label = f"{key} ({variant})"
-                    print(f" - {label}: {path}")
-            else:
-                print(f" - {key}: {variants}")
+    _print_outputs(outputs, adaptive_outputs)
+
+    if args.manifest and manifest is not None:
+        manifest_path = write_manifest(manifest, args.output / args.manifest)
+        print(f"マニフェスト: {manifest_path}")
@@ -0,0 +1,126 @@
+"""Visual comparison of two generated icon trees."""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from pathlib import Path
+from typing import Any, Dict, List
+
+from PIL import Image, ImageChops, ImageStat
+
+_IMAGE_SUFFIXES = {".png", ".webp", ".jpg", ".jpeg"}
+
+ImageDiff = Dict[str, Any]
+
+
+def _collect_images(root: Path) -> Dict[str, Path]:
+    """Return image files below *root* keyed by their POSIX relative path."""
+
+    return {
+        path.relative_to(root).as_posix(): path
+        for path in sorted(root.rglob("*"))
+        if path.is_file() and path.suffix.lower() in _IMAGE_SUFFIXES
+    }
+
+
+def compare_image_files(baseline: str | Path, candidate: str | Path) -> ImageDiff:
+    """Compare two encoded images and return their channel differences.
+
+    Files with identical bytes are reported without being decoded. Otherwise
+    both images are decoded, premultiplied by alpha (so colour hidden under
+    transparent pixels does not count) and compared with
+    ``ImageChops.difference``; ``max_diff`` is the largest difference over all
+    channels and ``mean_diff`` the mean difference over all pixels and
+    channels. Both are ``None`` when the image sizes differ.
+    """
+
+    baseline_data = Path(baseline).read_bytes()
+    candidate_data = Path(candidate).read_bytes()
+
+    if baseline_data == candidate_data:
+        return {"identical": True, "size_mismatch": False, "max_diff": 0, "mean_diff": 0.0}
+
+    with Image.open(BytesIO(baseline_data)) as img:
+        baseline_image = img.convert("RGBA").convert("RGBa")
+    with Image.open(BytesIO(candidate_data)) as img:
+        candidate_image = img.convert("RGBA").convert("RGBa")
+
+    if baseline_image.size != candidate_image.size:
+        return {
+            "identical": False,
+            "size_mismatch": True,
+            "baseline_size": list(baseline_image.size),
+            "candidate_size": list(candidate_image.size),
+            "max_diff": None,
+            "mean_diff": None,
+        }
+
+    diff = ImageChops.difference(baseline_image, candidate_image)
+    max_diff = max(high for _, high in diff.getextrema())
+    means = ImageStat.Stat(diff).mean
+
+    return {
+        "identical": False,
+        "size_mismatch": False,
+        "max_diff": max_diff,
+        "mean_diff": sum(means) / len(means),
+    }
+
+
+def compare_icon_trees(
+    baseline_dir: str | Path,
+    candidate_dir: str | Path,
+    *,
+    threshold: int = 0,
+    max_workers: int | None = None,
+) -> Dict[str, Any]:
+    """Compare every image in *candidate_dir* against *baseline_dir*.
+
+    Both directories are output trees produced by :func:`generate_android_icons`
+    or :func:`generate_adaptive_icon_layers`. Image pairs are compared in a
+    thread pool; a pair whose ``max_diff`` exceeds *threshold* (or whose sizes
+    differ) is listed under ``regressions``. Files present in only one tree
+    are listed under ``missing`` / ``added``.
+    """
+
+    if threshold < 0 or threshold > 255:
+        raise ValueError("threshold must be in the range [0, 255]")
+
+    baseline_root = Path(baseline_dir)
+    candidate_root = Path(candidate_dir)
+    for root in (baseline_root, candidate_root):
+        if not root.is_dir():
+            raise FileNotFoundError(f"Directory not found: {root}")
+
+    baseline_images = _collect_images(baseline_root)
+    candidate_images = _collect_images(candidate_root)
+    common = [name for name in baseline_images if name in candidate_images]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        diffs = list(
+            executor.map(
+                lambda name: compare_image_files(baseline_images[name], candidate_images[name]),
+                common,
+            )
+        )
+
+    images: List[ImageDiff] = []
+    regressions: List[ImageDiff] = []
+    for name, diff in zip(common, diffs):
+        entry = {"path": name, **diff}
+        images.append(entry)
+        if diff["size_mismatch"] or diff["max_diff"] > threshold:
+            regressions.append(entry)
+
+    return {
+        "baseline": str(baseline_root),
+        "candidate": str(candidate_root),
+        "threshold": threshold,
+        "compared": len(common),
+        "identical": sum(1 for diff in diffs if diff["identical"]),
+        "missing": [name for name in baseline_images if name not in candidate_images],
+        "added": [name for name in candidate_images if name not in baseline_images],
+        "regressions": regressions,
+        "images": images,
+    }
@@ -2,11 +2,16 @@
 
 from __future__ import annotations
 
+import hashlib
+import json
+import math
 from collections import Counter, deque
+from functools import lru_cache
+from io import BytesIO
 from pathlib import Path
-from typing import Dict, Mapping, Tuple
+from typing import Any, BinaryIO, Dict, List, Mapping, Tuple
 
-from PIL import Image, ImageDraw, ImageOps
+from PIL import Image, ImageChops, ImageDraw, ImageMode, ImageOps
 
 # Launcher icon edge lengths for each density bucket in pixels.
 ANDROID_ICON_SIZES: Mapping[str, int] = {
@@ -26,8 +31,29 @@ ADAPTIVE_ICON_SIZES: Mapping[str, int] = {
     "mipmap-xxxhdpi": 432,
 }
 
+# Adaptive icon layers are 108dp square; launchers only guarantee that a
+# centred circle of 66dp diameter stays visible.
+ADAPTIVE_SAFE_ZONE_RATIO = 66 / 108
+
 _WHITE = (255, 255, 255)
 
+ImageSource = str | Path | bytes | bytearray | memoryview | BinaryIO
+
+# Edge length of the proxy image used to analyse the foreground extent.
+_SAFE_ZONE_PROXY_EDGE = 256
+
+# Margin kept inside the safe circle, relative to the layer edge. LANCZOS
+# resizing leaves faint alpha up to about one output pixel beyond the extent
+# measured on the proxy, so one pixel at the smallest density is reserved.
+_SAFE_ZONE_MARGIN = 1 / min(ADAPTIVE_ICON_SIZES.values())
+
+# Supersampling factor per axis used to anti-alias the round icon mask.
+_ROUND_MASK_SUPERSAMPLE = 4
+
+MANIFEST_VERSION = 1
+
+ManifestEntry = Dict[str, Any]
+
 
 def _within_tolerance(color: Tuple[int, int, int], reference: Tuple[int, int, int], tolerance: int) -> bool:
     """Return True if *color* is within *tolerance* of *reference* per channel."""
@@ -130,17 +156,56 @@ def _remove_edge_background(image: Image.Image, tolerance: int) -> Image.Image:
     return rgba
 
 
-def load_image(source: str | Path) -> Image.Image:
-    """Load an image from disk and ensure it is in RGBA mode."""
+def load_image(source: ImageSource) -> Image.Image:
+    """Load an encoded image and ensure it is in RGBA mode.
+
+    *source* may be a path, the encoded bytes themselves (``bytes``,
+    ``bytearray`` or ``memoryview``) or a binary file-like object.
+    """
 
-    path = Path(source)
-    if not path.exists():
-        raise FileNotFoundError(f"Image not found: {path}")
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        stream: Path | BinaryIO = BytesIO(source)
+    elif hasattr(source, "read"):
+        stream = source
+    else:
+        stream = Path(source)
+        if not stream.exists():
+            raise FileNotFoundError(f"Image not found: {stream}")
 
-    with Image.open(path) as img:
+    with Image.open(stream) as img:
         return img.convert("RGBA")
 
 
+def image_from_buffer(
+    data: Any,
+    size: Tuple[int, int],
+    mode: str = "RGBA",
+    *,
+    raw_mode: str | None = None,
+) -> Image.Image:
+    """Wrap raw pixel data in a buffer-protocol object as an image.
+
+    *data* holds ``size[0] * size[1]`` pixels laid out row by row in *raw_mode*
+    (defaults to *mode*); packed raw modes such as ``1`` or ``BGR;16`` are
+    accepted. For modes Pillow can map directly (``L``, ``RGBA``,
+    ``RGBX``, ...) the pixels are shared with *data* rather than copied, so the
+    buffer must stay alive and unchanged while the image is in use. Raw modes
+    such as ``BGRA`` or ``ARGB`` are converted while decoding, which copies.
+    """
+
+    width, height = size
+    if width <= 0 or height <= 0:
+        raise ValueError(f"Image size must be positive, got {size}")
+
+    try:
+        ImageMode.getmode(mode)
+    except KeyError:
+        raise ValueError(f"Unsupported image mode: {mode}") from None
+
+    # Pillow raises ValueError itself when *data* is too short for *raw_mode*.
+    return Image.frombuffer(mode, size, data, "raw", raw_mode or mode, 0, 1)
+
+
 def crop_icon_from_image(image: Image.Image, *, tolerance: int = 10) -> Image.Image:
     """Return a tightly cropped version of *image* without the surrounding background.
 
@@ -151,7 +216,8 @@ def crop_icon_from_image(image: Image.Image, *, tolerance: int = 10) -> Image.Im
     if tolerance < 0 or tolerance > 255:
         raise ValueError("tolerance must be in the range [0, 255]")
 
-    rgba = image.convert("RGBA")
+    # _remove_edge_background works on its own copy, so RGBA input is used as is.
+    rgba = image if image.mode == "RGBA" else image.convert("RGBA")
     processed = _remove_edge_background(rgba, tolerance)
 
     bbox = processed.getbbox()
@@ -179,19 +245,37 @@ def crop_icon_from_image(image: Image.Image, *, tolerance: int = 10) -> Image.Im
     return square
 
 
-def _apply_round_mask(image: Image.Image) -> Image.Image:
-    """Return *image* with a circular alpha mask applied."""
+@lru_cache(maxsize=32)
+def _round_mask(size: Tuple[int, int]) -> Image.Image:
+    """Return an anti-aliased circular RGBA mask for *size*.
+
+    The ellipse is drawn at ``_ROUND_MASK_SUPERSAMPLE`` times the target size and
+    box-reduced, so the alpha band holds the fraction of each pixel's area inside
+    the circle. The colour bands are 255 wherever that coverage is non-zero and
+    0 elsewhere, so multiplying an image by the mask also clears the colour of
+    pixels entirely outside the circle. Masks are cached per size and must not
+    be modified by callers.
+    """
 
-    if image.mode != "RGBA":
-        image = image.convert("RGBA")
+    factor = _ROUND_MASK_SUPERSAMPLE
+    width, height = size
+    large = Image.new("L", (width * factor, height * factor), 0)
+    draw = ImageDraw.Draw(large)
+    draw.ellipse((0, 0, width * factor - 1, height * factor - 1), fill=255)
+    coverage = large.reduce(factor)
+    inside = coverage.point([0] + [255] * 255)
+    return Image.merge("RGBA", (inside, inside, inside, coverage))
 
-    mask = Image.new("L", image.size, 0)
-    draw = ImageDraw.Draw(mask)
-    draw.ellipse((0, 0, image.size[0] - 1, image.size[1] - 1), fill=255)
 
-    rounded = Image.new("RGBA", image.size, (0, 0, 0, 0))
-    rounded.paste(image, mask=mask)
-    return rounded
+def _apply_round_mask(image: Image.Image) -> Image.Image:
+    """Return *image* with an anti-aliased circular alpha mask applied.
+
+    A single multiply with the cached mask scales the existing alpha by the
+    circle coverage and clears pixels outside the circle to ``(0, 0, 0, 0)``.
+    """
+
+    rgba = image.convert("RGBA") if image.mode != "RGBA" else image
+    return ImageChops.multiply(rgba, _round_mask(rgba.size))
 
 
 def _deduce_format(filename: str, explicit_format: str | None) -> str:
@@ -208,7 +292,9 @@ def _deduce_format(filename: str, explicit_format: str | None) -> str:
     return fmt
 
 
-def _save_image(image: Image.Image, path: Path, fmt: str) -> None:
+def _save_image(image: Image.Image, path: Path, fmt: str) -> bytes:
+    """Encode *image* as *fmt*, write it to *path* and return the encoded bytes."""
+
     target = image
     if fmt.upper() == "WEBP" and image.mode not in {"RGBA", "RGB"}:
         target = image.convert("RGBA")
@@ -217,7 +303,50 @@ def _save_image(image: Image.Image, path: Path, fmt: str) -> None:
     if fmt.upper() == "WEBP":
         kwargs["lossless"] = True
 
-    target.save(path, format=fmt, **kwargs)
+    buffer = BytesIO()
+    target.save(buffer, format=fmt, **kwargs)
+    data = buffer.getvalue()
+    path.write_bytes(data)
+    return data
+
+
+def _manifest_entry(
+    path: Path,
+    base_dir: Path,
+    data: bytes,
+    *,
+    density: str | None,
+    variant: str,
+    fmt: str,
+    size: Tuple[int, int] | None,
+) -> ManifestEntry:
+    width, height = size if size is not None else (None, None)
+    return {
+        "path": path.relative_to(base_dir).as_posix(),
+        "density": density,
+        "variant": variant,
+        "width": width,
+        "height": height,
+        "format": fmt,
+        "bytes": len(data),
+        "sha256": hashlib.sha256(data).hexdigest(),
+    }
+
+
+def write_manifest(entries: List[ManifestEntry], path: str | Path) -> Path:
+    """Write manifest *entries* collected by the generators as JSON to *path*.
+
+    Entries are sorted by path so that identical runs produce identical files.
+    """
+
+    manifest_path = Path(path)
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    document = {
+        "version": MANIFEST_VERSION,
+        "outputs": sorted(entries, key=lambda entry: entry["path"]),
+    }
+    manifest_path.write_text(json.dumps(document, indent=2) + "\n", encoding="utf-8")
+    return manifest_path
 
 
 def generate_android_icons(
@@ -229,11 +358,14 @@ def generate_android_icons(
     round_filename: str | None = "ic_launcher_round.webp",
     round_format: str | None = None,
     sizes: Mapping[str, int] | None = None,
+    manifest: List[ManifestEntry] | None = None,
 ) -> Dict[str, Dict[str, Path]]:
     """Generate resized Android icons.
 
     Returns a mapping ``density -> {"default": Path, "round": Path}`` (the ``round``
-    key is present only when ``round_filename`` is provided).
+    key is present only when ``round_filename`` is provided). When *manifest* is
+    given, an entry describing each written file (including its SHA-256 hash) is
+    appended to it; see :func:`write_manifest`.
     """
 
     if icon.mode not in {"RGB", "RGBA"}:
@@ -260,14 +392,38 @@ def generate_android_icons(
         resized = ImageOps.fit(icon, (edge, edge), method=Image.Resampling.LANCZOS)
         default_path = target_dir / filename
 
-        _save_image(resized, default_path, inferred_format)
+        data = _save_image(resized, default_path, inferred_format)
+        if manifest is not None:
+            manifest.append(
+                _manifest_entry(
+                    default_path,
+                    base_dir,
+                    data,
+                    density=density,
+                    variant="default",
+                    fmt=inferred_format,
+                    size=resized.size,
+                )
+            )
 
         density_outputs: Dict[str, Path] = {"default": default_path}
 
         if round_filename and round_inferred_format:
             round_path = target_dir / round_filename
             round_icon = _apply_round_mask(resized)
-            _save_image(round_icon, round_path, round_inferred_format)
+            data = _save_image(round_icon, round_path, round_inferred_format)
+            if manifest is not None:
+                manifest.append(
+                    _manifest_entry(
+                        round_path,
+                        base_dir,
+                        data,
+                        density=density,
+                        variant="round",
+                        fmt=round_inferred_format,
+                        size=round_icon.size,
+                    )
+                )
             density_outputs["round"] = round_path
 
         output_paths[density] = density_outputs
@@ -284,16 +440,27 @@ def generate_adaptive_icon_layers(
     image_format: str | None = None,
     background_color: str = "#ffffff",
     foreground_scale: float = 0.9,
+    auto_scale: bool = False,
     xml_name: str = "ic_launcher.xml",
     xml_round_name: str = "ic_launcher_round.xml",
+    manifest: List[ManifestEntry] | None = None,
 ) -> Dict[str, Dict[str, Path]]:
-    """Generate adaptive icon layer assets (foreground/background + XML)."""
+    """Generate adaptive icon layer assets (foreground/background + XML).
 
-    if not (0 < foreground_scale <= 1.0):
-        raise ValueError("foreground_scale must be between 0 and 1")
+    With *auto_scale*, *foreground_scale* is ignored and replaced by the scale
+    that keeps the visible content inside the safe zone (see
+    :func:`compute_safe_zone_scale`). When *manifest* is given, an entry for
+    each written file is appended to it.
+    """
 
     rgba_icon = icon.convert("RGBA") if icon.mode != "RGBA" else icon.copy()
 
+    if auto_scale:
+        foreground_scale = compute_safe_zone_scale(rgba_icon)
+
+    if not (0 < foreground_scale <= 1.0):
+        raise ValueError("foreground_scale must be between 0 and 1")
+
     foreground_format = _deduce_format(foreground_filename, image_format)
     background_format = _deduce_format(background_filename, image_format)
 
@@ -309,7 +476,19 @@ def generate_adaptive_icon_layers(
 
         bg_image = Image.new("RGBA", (edge, edge), background_rgba)
         bg_path = target_dir / background_filename
-        _save_image(bg_image, bg_path, background_format)
+        data = _save_image(bg_image, bg_path, background_format)
+        if manifest is not None:
+            manifest.append(
+                _manifest_entry(
+                    bg_path,
+                    base_dir,
+                    data,
+                    density=density,
+                    variant="background",
+                    fmt=background_format,
+                    size=bg_image.size,
+                )
+            )
 
         foreground_edge = max(1, int(edge * foreground_scale))
         scaled = ImageOps.contain(
@@ -322,7 +501,19 @@ def generate_adaptive_icon_layers(
         canvas.paste(scaled, offset, scaled)
 
         fg_path = target_dir / foreground_filename
-        _save_image(canvas, fg_path, foreground_format)
+        data = _save_image(canvas, fg_path, foreground_format)
+        if manifest is not None:
+            manifest.append(
+                _manifest_entry(
+                    fg_path,
+                    base_dir,
+                    data,
+                    density=density,
+                    variant="foreground",
+                    fmt=foreground_format,
+                    size=canvas.size,
+                )
+            )
 
         output_paths[density] = {
             "background": bg_path,
@@ -343,22 +534,106 @@ def generate_adaptive_icon_layers(
         "</adaptive-icon>\n"
     )
 
-    xml_path = xml_dir / xml_name
-    xml_path.write_text(xml_content, encoding="utf-8")
+    xml_data = xml_content.encode("utf-8")
 
-    xml_outputs: Dict[str, Path] = {xml_name: xml_path}
-
-    if xml_round_name:
-        xml_round_path = xml_dir / xml_round_name
-        xml_round_path.write_text(xml_content, encoding="utf-8")
-        xml_outputs[xml_round_name] = xml_round_path
+    xml_outputs: Dict[str, Path] = {}
+    for name in (xml_name, xml_round_name):
+        if not name:
+            continue
+        path = xml_dir / name
+        path.write_bytes(xml_data)
+        xml_outputs[name] = path
+        if manifest is not None:
+            manifest.append(
+                _manifest_entry(
+                    path,
+                    base_dir,
+                    xml_data,
+                    density=xml_dir.name,
+                    variant="xml",
+                    fmt="XML",
+                    size=None,
+                )
+            )
 
     output_paths["xml"] = xml_outputs
 
     return output_paths
 
 
-def prepare_icon(source: str | Path, *, tolerance: int = 10) -> Image.Image:
+@lru_cache(maxsize=4)
+def _radial_distance_map(edge: int) -> Image.Image:
+    """Return an ``L`` image holding each pixel's distance from the centre.
+
+    Values are scaled so that 255 corresponds to half the diagonal. The map is
+    cached per edge length and must not be modified by callers.
+    """
+
+    centre = edge / 2
+    scale = 255 / (centre * math.sqrt(2))
+    distances = bytes(
+        min(255, int(math.hypot(x + 0.5 - centre, y + 0.5 - centre) * scale))
+        for y in range(edge)
+        for x in range(edge)
+    )
+    return Image.frombytes("L", (edge, edge), distances)
+
+
+def analyze_safe_zone(icon: Image.Image, *, alpha_threshold: int = 0) -> Tuple[float, float]:
+    """Measure how far the visible content of *icon* reaches from its centre.
+
+    The icon is fitted into a small square proxy the same way the adaptive
+    foreground is fitted into its canvas. Returns ``(coverage, radius)`` where
+    *coverage* is the fraction of canvas pixels with alpha above
+    *alpha_threshold* and *radius* is the distance of the farthest such pixel
+    from the centre, relative to half the canvas edge (``1.0`` touches the
+    middle of an edge, ``sqrt(2)`` a corner).
+    """
+
+    if alpha_threshold < 0 or alpha_threshold > 254:
+        raise ValueError("alpha_threshold must be in the range [0, 254]")
+
+    edge = _SAFE_ZONE_PROXY_EDGE
+    rgba_icon = icon.convert("RGBA") if icon.mode != "RGBA" else icon
+    proxy = ImageOps.contain(rgba_icon, (edge, edge), method=Image.Resampling.BOX)
+
+    alpha = Image.new("L", (edge, edge), 0)
+    alpha.paste(proxy.getchannel("A"), ((edge - proxy.width) // 2, (edge - proxy.height) // 2))
+
+    mask = alpha.point([0] * (alpha_threshold + 1) + [255] * (255 - alpha_threshold))
+    visible = mask.histogram()[255]
+    if visible == 0:
+        return 0.0, 0.0
+
+    _, farthest = ImageChops.multiply(_radial_distance_map(edge), mask).getextrema()
+    # Round up by one step so the quantised distance never underestimates.
+    radius = min(255, farthest + 1) / 255 * math.sqrt(2)
+    return visible / (edge * edge), radius
+
+
+def compute_safe_zone_scale(
+    icon: Image.Image,
+    *,
+    safe_zone_ratio: float = ADAPTIVE_SAFE_ZONE_RATIO,
+    alpha_threshold: int = 0,
+) -> float:
+    """Return the largest foreground scale keeping *icon* inside the safe zone.
+
+    *safe_zone_ratio* is the safe circle diameter relative to the layer edge.
+    The circle is shrunk by one pixel of the smallest density on each side to
+    absorb resampling fringes. The result is capped at ``1.0``.
+    """
+
+    if not (2 * _SAFE_ZONE_MARGIN < safe_zone_ratio <= 1.0):
+        raise ValueError("safe_zone_ratio must be between 0 and 1")
+
+    _, radius = analyze_safe_zone(icon, alpha_threshold=alpha_threshold)
+    if radius == 0:
+        return 1.0
+    return min(1.0, (safe_zone_ratio - 2 * _SAFE_ZONE_MARGIN) / radius)
+
+
+def prepare_icon(source: ImageSource, *, tolerance: int = 10) -> Image.Image:
     """Load and crop *source* image, returning the processed icon."""
 
     return crop_icon_from_image(load_image(source), tolerance=tolerance)
@@ -0,0 +1,99 @@
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from makeandroidicon.batch import (
+    BatchJob,
+    _next_admissible,
+    estimate_peak_memory,
+    parse_memory_size,
+    plan_batch,
+    run_batch,
+)
+from makeandroidicon.cli import main
+from makeandroidicon.icon_generator import ANDROID_ICON_SIZES
+
+
+def test_parse_memory_size() -> None:
+    assert parse_memory_size("1024") == 1024
+    assert parse_memory_size("512M") == 512 * 1024**2
+    assert parse_memory_size("4GiB") == 4 * 1024**3
+    assert parse_memory_size("1.5k") == 1536
+
+    with pytest.raises(ValueError):
+        parse_memory_size("lots")
+
+
+def test_estimate_peak_memory_scales_with_header(tmp_path: Path) -> None:
+    small = tmp_path / "small.png"
+    large = tmp_path / "large.png"
+    Image.new("RGB", (10, 10), (255, 255, 255)).save(small)
+    Image.new("RGB", (20, 20), (255, 255, 255)).save(large)
+
+    assert estimate_peak_memory(large) == 4 * estimate_peak_memory(small)
+
+
+def test_next_admissible_prefers_largest_fitting_job() -> None:
+    big = BatchJob(Path("big.png"), Path("out/big"), 300)
+    medium = BatchJob(Path("medium.png"), Path("out/medium"), 200)
+    small = BatchJob(Path("small.png"), Path("out/small"), 100)
+    pending = [big, medium, small]
+
+    assert _next_admissible(pending, None, idle=False) is big
+    assert _next_admissible(pending, 250, idle=False) is medium
+    assert _next_admissible(pending, 50, idle=False) is None
+    # 予算を超えるジョブでも、他に実行中のものがなければ単独で実行する
+    assert _next_admissible(pending, 50, idle=True) is big
+
+
+def test_run_batch_generates_icons_per_source(tmp_path: Path) -> None:
+    sources = []
+    for name, edge in (("first", 64), ("second", 128)):
+        path = tmp_path / f"{name}.png"
+        Image.new("RGBA", (edge, edge), (0, 128, 0, 255)).save(path)
+        sources.append(path)
+
+    jobs = plan_batch(sources, tmp_path / "out")
+    budget = max(job.estimated_bytes for job in jobs)
+    results = run_batch(
+        jobs,
+        icon_options={"filename": "ic_launcher.png", "round_filename": None},
+        max_memory=budget,
+        max_workers=2,
+    )
+
+    assert list(results) == sources
+    for source, (outputs, adaptive_outputs) in results.items():
+        assert adaptive_outputs is None
+        assert set(outputs) == set(ANDROID_ICON_SIZES)
+        assert outputs["mipmap-mdpi"]["default"].parent.parent == tmp_path / "out" / source.stem
+
+
+def test_run_batch_rejects_zero_workers() -> None:
+    with pytest.raises(ValueError):
+        run_batch([], max_workers=0)
+
+
+def test_plan_batch_rejects_conflicting_stems(tmp_path: Path) -> None:
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    for folder in ("a", "b"):
+        Image.new("RGB", (8, 8)).save(tmp_path / folder / "icon.png")
+
+    with pytest.raises(ValueError):
+        plan_batch([tmp_path / "a" / "icon.png", tmp_path / "b" / "icon.png"], tmp_path / "out")
+
+
+def test_cli_warns_when_batch_options_given_for_single_source(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    source = tmp_path / "icon.png"
+    Image.new("RGBA", (64, 64), (0, 128, 0, 255)).save(source)
+
+    main([str(source), "-o", str(tmp_path / "out"), "--max-memory", "512M", "--jobs", "2"])
+
+    err = capsys.readouterr().err
+    assert "--jobs" in err
+    assert "--max-memory" in err
+    assert (tmp_path / "out" / "mipmap-mdpi" / "ic_launcher.webp").exists()
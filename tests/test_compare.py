@@ -0,0 +1,97 @@
+import json
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from makeandroidicon.cli import main
+from makeandroidicon.compare import compare_icon_trees
+from makeandroidicon.icon_generator import ANDROID_ICON_SIZES, generate_android_icons
+
+
+def _generate(output_dir: Path, color: tuple) -> None:
+    icon = Image.new("RGBA", (256, 256), color)
+    generate_android_icons(icon, output_dir, filename="ic_launcher.png", round_filename=None)
+
+
+def test_compare_icon_trees_identical(tmp_path: Path) -> None:
+    _generate(tmp_path / "a", (0, 128, 0, 255))
+    _generate(tmp_path / "b", (0, 128, 0, 255))
+
+    report = compare_icon_trees(tmp_path / "a", tmp_path / "b")
+
+    assert report["compared"] == len(ANDROID_ICON_SIZES)
+    assert report["identical"] == len(ANDROID_ICON_SIZES)
+    assert report["regressions"] == []
+
+
+def test_compare_icon_trees_reports_regressions_above_threshold(tmp_path: Path) -> None:
+    _generate(tmp_path / "a", (0, 128, 0, 255))
+    _generate(tmp_path / "b", (0, 130, 0, 255))
+    (tmp_path / "b" / "play-store" / "ic_launcher.png").unlink()
+
+    tolerant = compare_icon_trees(tmp_path / "a", tmp_path / "b", threshold=2)
+    assert tolerant["regressions"] == []
+    assert tolerant["missing"] == ["play-store/ic_launcher.png"]
+
+    strict = compare_icon_trees(tmp_path / "a", tmp_path / "b", threshold=1)
+    assert len(strict["regressions"]) == len(ANDROID_ICON_SIZES) - 1
+    entry = strict["regressions"][0]
+    assert entry["max_diff"] == 2
+    assert entry["mean_diff"] == pytest.approx(0.5)
+
+
+def test_compare_ignores_colour_under_transparent_pixels(tmp_path: Path) -> None:
+    for name, hidden in (("a", (255, 0, 0, 0)), ("b", (0, 255, 0, 0))):
+        (tmp_path / name).mkdir()
+        Image.new("RGBA", (48, 48), hidden).save(tmp_path / name / "ic_launcher.png")
+
+    report = compare_icon_trees(tmp_path / "a", tmp_path / "b")
+
+    assert report["identical"] == 0
+    assert report["regressions"] == []
+    assert report["images"][0]["max_diff"] == 0
+
+
+def test_compare_reports_size_mismatch_without_measurements(tmp_path: Path) -> None:
+    for name, edge in (("a", 48), ("b", 72)):
+        (tmp_path / name).mkdir()
+        Image.new("RGBA", (edge, edge), (0, 128, 0, 255)).save(tmp_path / name / "ic_launcher.png")
+
+    report = compare_icon_trees(tmp_path / "a", tmp_path / "b")
+
+    (entry,) = report["regressions"]
+    assert entry["size_mismatch"]
+    assert entry["max_diff"] is None
+    assert entry["mean_diff"] is None
+
+
+def test_compare_subcommand_writes_report(tmp_path: Path) -> None:
+    _generate(tmp_path / "a", (0, 128, 0, 255))
+    _generate(tmp_path / "b", (255, 0, 0, 255))
+    report_path = tmp_path / "report.json"
+
+    with pytest.raises(SystemExit) as excinfo:
+        main(["compare", str(tmp_path / "a"), str(tmp_path / "b"), "--report", str(report_path)])
+
+    assert excinfo.value.code == 1
+    report = json.loads(report_path.read_text(encoding="utf-8"))
+    assert len(report["regressions"]) == len(ANDROID_ICON_SIZES)
+
+
+def test_cli_help_lists_compare_subcommand(capsys: pytest.CaptureFixture[str]) -> None:
+    with pytest.raises(SystemExit):
+        main(["--help"])
+
+    assert "compare" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("option", [["--threshold", "300"], ["--threshold", "-1"], ["--jobs", "0"]])
+def test_compare_subcommand_rejects_out_of_range_options(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str], option: list
+) -> None:
+    with pytest.raises(SystemExit) as excinfo:
+        main(["compare", str(tmp_path), str(tmp_path), *option])
+
+    assert excinfo.value.code == 2
+    assert option[0] in capsys.readouterr().err
@@ -1,13 +1,27 @@
+import hashlib
+import json
+import math
+from io import BytesIO
 from pathlib import Path
 
+import pytest
 from PIL import Image, ImageDraw
 
 from makeandroidicon.icon_generator import (
     ADAPTIVE_ICON_SIZES,
+    ADAPTIVE_SAFE_ZONE_RATIO,
     ANDROID_ICON_SIZES,
+    _apply_round_mask,
+    _round_mask,
+    analyze_safe_zone,
+    compute_safe_zone_scale,
     crop_icon_from_image,
     generate_adaptive_icon_layers,
     generate_android_icons,
+    image_from_buffer,
+    load_image,
+    prepare_icon,
+    write_manifest,
 )
 
 
@@ -133,3 +147,155 @@ def test_generate_adaptive_icon_layers(tmp_path: Path) -> None:
     assert "@mipmap/ic_launcher_foreground" in content
     assert "@mipmap/ic_launcher_background" in content
     assert xml_round_path.read_text(encoding="utf-8") == content
+
+
+def test_apply_round_mask_antialiases_edges() -> None:
+    icon = Image.new("RGBA", (48, 48), (0, 128, 0, 200))
+
+    rounded = _apply_round_mask(icon)
+
+    assert rounded.getpixel((0, 0)) == (0, 0, 0, 0)
+    assert rounded.getpixel((24, 24)) == (0, 128, 0, 200)
+    histogram = rounded.getchannel("A").histogram()
+    # 縁は 0 と元のアルファの中間値になる
+    assert any(histogram[1:200])
+    assert not any(histogram[201:])
+    assert _round_mask((48, 48)) is _round_mask((48, 48))
+
+
+def test_apply_round_mask_clears_colour_outside_circle() -> None:
+    icon = Image.new("RGBA", (72, 72), (255, 255, 255, 255))
+
+    rounded = _apply_round_mask(icon)
+
+    alpha = rounded.getchannel("A").load()
+    transparent = [
+        rounded.getpixel((x, y))
+        for y in range(72)
+        for x in range(72)
+        if alpha[x, y] == 0
+    ]
+    assert transparent
+    assert all(pixel == (0, 0, 0, 0) for pixel in transparent)
+
+
+def test_generate_icons_manifest_records_hashes(tmp_path: Path) -> None:
+    icon = Image.new("RGBA", (256, 256), (0, 128, 0, 255))
+    manifest: list = []
+
+    generate_android_icons(icon, tmp_path, filename="ic_launcher.png", manifest=manifest)
+    generate_adaptive_icon_layers(icon, tmp_path, manifest=manifest)
+    manifest_path = write_manifest(manifest, tmp_path / "manifest.json")
+
+    document = json.loads(manifest_path.read_text(encoding="utf-8"))
+    entries = {entry["path"]: entry for entry in document["outputs"]}
+
+    mdpi_round = entries["mipmap-mdpi/ic_launcher_round.webp"]
+    assert mdpi_round["density"] == "mipmap-mdpi"
+    assert mdpi_round["variant"] == "round"
+    assert mdpi_round["format"] == "WEBP"
+    assert (mdpi_round["width"], mdpi_round["height"]) == (48, 48)
+
+    assert entries["mipmap-anydpi-v26/ic_launcher.xml"]["variant"] == "xml"
+    assert len(entries) == len(ANDROID_ICON_SIZES) * 2 + len(ADAPTIVE_ICON_SIZES) * 2 + 2
+
+    for relative, entry in entries.items():
+        data = (tmp_path / relative).read_bytes()
+        assert entry["bytes"] == len(data)
+        assert entry["sha256"] == hashlib.sha256(data).hexdigest()
+
+
+def test_compute_safe_zone_scale_uses_visible_extent() -> None:
+    square = Image.new("RGBA", (512, 512), (0, 0, 0, 255))
+    coverage, radius = analyze_safe_zone(square)
+    assert coverage == 1.0
+    assert radius == math.sqrt(2)
+
+    circle = Image.new("RGBA", (512, 512), (0, 0, 0, 0))
+    ImageDraw.Draw(circle).ellipse((0, 0, 511, 511), fill=(255, 0, 0, 255))
+    scale = compute_safe_zone_scale(circle)
+    assert 0.58 < scale < ADAPTIVE_SAFE_ZONE_RATIO
+
+    small = Image.new("RGBA", (512, 512), (0, 0, 0, 0))
+    ImageDraw.Draw(small).ellipse((192, 192, 319, 319), fill=(255, 0, 0, 255))
+    assert compute_safe_zone_scale(small) == 1.0
+
+
+@pytest.mark.parametrize("shape", ["circle", "square"])
+def test_generate_adaptive_icon_layers_auto_scale(tmp_path: Path, shape: str) -> None:
+    if shape == "circle":
+        icon = Image.new("RGBA", (512, 512), (0, 0, 0, 0))
+        ImageDraw.Draw(icon).ellipse((0, 0, 511, 511), fill=(0, 180, 255, 255))
+    else:
+        icon = Image.new("RGBA", (512, 512), (0, 180, 255, 255))
+
+    outputs = generate_adaptive_icon_layers(icon, tmp_path, image_format="PNG", auto_scale=True)
+
+    for density, edge in ADAPTIVE_ICON_SIZES.items():
+        with Image.open(outputs[density]["foreground"]) as fg_img:
+            alpha = fg_img.getchannel("A").load()
+        centre = edge / 2
+        # 透明度が 0 でない最も外側の画素も含めてセーフゾーン内に収まる
+        farthest = max(
+            math.hypot(x + 0.5 - centre, y + 0.5 - centre)
+            for y in range(edge)
+            for x in range(edge)
+            if alpha[x, y] > 0
+        )
+        assert farthest <= edge * ADAPTIVE_SAFE_ZONE_RATIO / 2
+
+
+def test_image_from_buffer_shares_pixels() -> None:
+    image = Image.new("RGBA", (100, 100), (255, 255, 255, 255))
+    ImageDraw.Draw(image).rectangle((20, 20, 79, 79), fill=(0, 128, 0, 255))
+    buffer = bytearray(image.tobytes())
+
+    wrapped = image_from_buffer(memoryview(buffer), (100, 100))
+    offset = (50 * 100 + 50) * 4
+    buffer[offset : offset + 4] = bytes((1, 2, 3, 255))
+    assert wrapped.getpixel((50, 50)) == (1, 2, 3, 255)
+
+    cropped = crop_icon_from_image(wrapped, tolerance=10)
+    assert cropped.size == (60, 60)
+
+    with pytest.raises(ValueError):
+        image_from_buffer(buffer, (101, 100))
+
+
+def test_image_from_buffer_converts_raw_mode() -> None:
+    bgra = bytes((255, 128, 0, 200)) * 4
+
+    image = image_from_buffer(bgra, (2, 2), "RGBA", raw_mode="BGRA")
+
+    assert image.getpixel((1, 1)) == (0, 128, 255, 200)
+
+    with pytest.raises(ValueError):
+        image_from_buffer(bgra, (2, 2), "NOPE")
+
+
+def test_image_from_buffer_accepts_packed_raw_modes() -> None:
+    bitmap = image_from_buffer(b"\xff\x00" * 16, (16, 16), "1")
+    assert bitmap.getpixel((0, 0)) == 255
+    assert bitmap.getpixel((8, 0)) == 0
+
+    # BGR;16 は 1 画素 2 バイト (RGB は 3 バイト)
+    packed = image_from_buffer(b"\x1f\x00" * 16, (4, 4), "RGB", raw_mode="BGR;16")
+    assert packed.size == (4, 4)
+    assert packed.getpixel((0, 0)) == (0, 0, 255)
+
+    with pytest.raises(ValueError):
+        image_from_buffer(bytes(30), (4, 4), "RGB", raw_mode="BGR;16")
+
+
+def test_load_image_accepts_encoded_bytes_and_file_objects() -> None:
+    encoded = BytesIO()
+    source = Image.new("RGB", (32, 16), (255, 255, 255))
+    ImageDraw.Draw(source).rectangle((4, 4, 11, 7), fill=(0, 0, 255))
+    source.save(encoded, format="PNG")
+
+    from_bytes = load_image(encoded.getvalue())
+    assert from_bytes.mode == "RGBA"
+    assert from_bytes.size == (32, 16)
+
+    encoded.seek(0)
+    assert prepare_icon(encoded).size == (8, 8)